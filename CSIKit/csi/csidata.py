@@ -41,6 +41,14 @@ class CSIData:
             self.frames.append(frame)
             self.timestamps.append(timestamp)
 
+    def push_frames(self, frames: list, timestamps: list):
+        if self.filter_mac is not None:
+            for frame, timestamp in zip(frames, timestamps):
+                self.push_frame(frame, timestamp)
+        else:
+            self.frames.extend(frames)
+            self.timestamps.extend(timestamps)
+
     def get_metadata(self) -> CSIMetadata:
         chipset = self.chipset
         backend = self.backend
@@ -1,4 +1,7 @@
 class CSIFrame:
 
+    #Empty slots let subclasses that declare __slots__ avoid a per-instance __dict__.
+    __slots__ = ()
+
     def __init__(self):
         pass
\ No newline at end of file
@@ -111,7 +111,8 @@ class ESP32CSIFrame(CSIFrame):
 
     __slots__ = ["type", "role", "mac", "rssi", "rate", "sig_mode", "mcs", "bandwidth", "smoothing", "not_sounding",
                  "aggregation", "stbc", "fec_coding", "sgi", "noise_floor", "ampdu_cnt", "channel", "secondary_channel",
-                 "local_timestamp", "ant", "sig_len", "rx_state", "real_time_set", "real_timestamp", "len", "CSI_DATA"]
+                 "local_timestamp", "ant", "sig_len", "rx_state", "real_time_set", "real_timestamp", "len", "CSI_DATA",
+                 "csi_matrix"]
 
     def __init__(self, csv_line: list):
         if len(csv_line) == 3 or len(csv_line) == 4:
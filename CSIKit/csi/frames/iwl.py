@@ -38,6 +38,12 @@ class IWLCSIFrame(CSIFrame):
             Bitmask containing the rate options used for frame transmission.
         csi_matrix : np.array
             Matrix of CSI values.
+            When raw_i8 is set, this is built (via complex()) on every access, and isn't cached.
+            Modifying the returned matrix doesn't change the frame; assign csi_matrix instead.
+        raw_i8 : np.array
+            Optional (30, n_rx, n_tx, 2) int8 real/imag planes, kept in place of a complex matrix.
+        scale_factor : float
+            Scale applied to raw_i8 when converting to complex or amplitude values.
 
     """
 
@@ -54,9 +60,11 @@ class IWLCSIFrame(CSIFrame):
         "antenna_sel",
         "length",
         "rate",
-        "csi_matrix"
+        "_csi_matrix",
+        "raw_i8",
+        "scale_factor"
     ]
-    def __init__(self, header_block: list, csi_matrix: np.array):
+    def __init__(self, header_block: list, csi_matrix: np.array, raw_i8: np.array=None, scale_factor: float=1.0):
         self.timestamp_low = header_block[0]
         self.bfee_count = header_block[1]
         self.n_rx = header_block[3]
@@ -70,7 +78,43 @@ class IWLCSIFrame(CSIFrame):
         self.length = header_block[11]
         self.rate = header_block[12]
         # self.perm = header_block[13]
-        self.csi_matrix = csi_matrix
+        self._csi_matrix = csi_matrix
+        self.raw_i8 = raw_i8
+        self.scale_factor = scale_factor
+
+    @property
+    def csi_matrix(self) -> np.array:
+        #Not cached when built from raw_i8, as keeping it would cost more memory than the plain complex64 path.
+        return self.complex()
+
+    @csi_matrix.setter
+    def csi_matrix(self, csi_matrix: np.array):
+        #An explicitly assigned matrix replaces any raw planes, so complex()/amplitude() reflect it too.
+        self._csi_matrix = csi_matrix
+        self.raw_i8 = None
+        self.scale_factor = 1.0
+
+    def complex(self) -> np.array:
+        """Returns the scaled complex64 CSI matrix, building it from raw_i8 where present."""
+        if self.raw_i8 is None:
+            return self._csi_matrix
+
+        #Casting the int8 planes to float32 gives interleaved real/imag pairs, which view directly as complex64.
+        csi = self.raw_i8.astype(np.float32).view(np.complex64)[..., 0]
+        np.multiply(csi, np.float32(self.scale_factor), out=csi)
+
+        return csi
+
+    def amplitude(self) -> np.array:
+        """Returns the scaled CSI amplitude, without building a complex matrix where raw_i8 is present."""
+        if self.raw_i8 is None:
+            return np.abs(self._csi_matrix)
+
+        raw = self.raw_i8.astype(np.float32)
+        amplitude = np.hypot(raw[..., 0], raw[..., 1])
+        np.multiply(amplitude, np.float32(self.scale_factor), out=amplitude)
+
+        return amplitude
 
     @classmethod
     def from_picoscenes(cls, frame_container: "FrameContainer"):
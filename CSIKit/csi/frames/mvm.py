@@ -54,6 +54,7 @@ class IWLMVMCSIFrame(CSIFrame):
         "antenna_sel",
         "length",
         "rate",
+        "source_mac",
         "csi_matrix",
 
         "frame_container"
@@ -53,6 +53,7 @@ class USRPCSIFrame(CSIFrame):
         "timestamp",
         "csi_length",
         "tx_channel",
+        "channel_freq",
         "mac",
         "err_info",
         "noise_floor",
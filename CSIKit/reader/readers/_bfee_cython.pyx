@@ -0,0 +1,81 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True, language_level=3
+
+# Optional compiled IWL5300 CSI decoder.
+# Built by setup.py when Cython is available, otherwise IWLBeamformReader falls back to Numba/NumPy.
+
+cpdef read_bfee_c(const unsigned char[::1] data, int n_rx, int n_tx, const Py_ssize_t[::1] perm, float complex[:, :, :] out):
+    """
+        Unpacks the IWL5300 CSI payload into a preallocated (30, n_rx, n_tx) complex64 matrix.
+
+        Parameters:
+            data {np.array} -- uint8 view of the CSI payload.
+            n_rx {int} -- Number of receiving antennas present.
+            n_tx {int} -- Number of transmitting antennas present.
+            perm {np.array} -- Antenna permutation, already clamped to range(n_rx).
+            out {np.array} -- Zeroed output matrix, which may be a strided view. Entries beyond a truncated payload are left untouched.
+
+        Compiled without bounds checks, so n_rx/n_tx/perm/out must already have been checked by IWLBeamformReader.validate_antennas.
+    """
+
+    cdef Py_ssize_t length = data.shape[0]
+    cdef Py_ssize_t index = 0
+    cdef Py_ssize_t ind8
+    cdef int i, j, k, remainder, real, imag
+
+    for i in range(30):
+        index += 3
+        remainder = index & 7
+        for j in range(n_rx):
+            for k in range(n_tx):
+                ind8 = index >> 3
+
+                if ind8 + 2 >= length:
+                    return
+
+                real = ((data[ind8] >> remainder) | (data[ind8 + 1] << (8 - remainder))) & 0xFF # 8-bit truncation
+                if real > 127: # convert from unsigned rep to signed
+                    real -= 256
+
+                imag = ((data[ind8 + 1] >> remainder) | (data[ind8 + 2] << (8 - remainder))) & 0xFF
+                if imag > 127:
+                    imag -= 256
+
+                out[i, perm[j], k].real = real
+                out[i, perm[j], k].imag = imag
+
+                index += 16
+
+cpdef read_bfee_i8_c(const unsigned char[::1] data, int n_rx, int n_tx, const Py_ssize_t[::1] perm, signed char[:, :, :, :] out):
+    """
+        Unpacks the IWL5300 CSI payload into preallocated (30, n_rx, n_tx, 2) int8 real/imag planes.
+
+        Parameters:
+            data {np.array} -- uint8 view of the CSI payload.
+            n_rx {int} -- Number of receiving antennas present.
+            n_tx {int} -- Number of transmitting antennas present.
+            perm {np.array} -- Antenna permutation, already clamped to range(n_rx).
+            out {np.array} -- Zeroed output planes, which may be a strided view. Entries beyond a truncated payload are left untouched.
+
+        Compiled without bounds checks, so n_rx/n_tx/perm/out must already have been checked by IWLBeamformReader.validate_antennas.
+    """
+
+    cdef Py_ssize_t length = data.shape[0]
+    cdef Py_ssize_t index = 0
+    cdef Py_ssize_t ind8
+    cdef int i, j, k, remainder
+
+    for i in range(30):
+        index += 3
+        remainder = index & 7
+        for j in range(n_rx):
+            for k in range(n_tx):
+                ind8 = index >> 3
+
+                if ind8 + 2 >= length:
+                    return
+
+                # 8-bit truncation, then reinterpreted as signed by the store.
+                out[i, perm[j], k, 0] = <signed char>(((data[ind8] >> remainder) | (data[ind8 + 1] << (8 - remainder))) & 0xFF)
+                out[i, perm[j], k, 1] = <signed char>(((data[ind8 + 1] >> remainder) | (data[ind8 + 2] << (8 - remainder))) & 0xFF)
+
+                index += 16
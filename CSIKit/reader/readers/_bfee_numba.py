@@ -0,0 +1,145 @@
+import numpy as np
+
+# Numba is an optional dependency.
+# When it isn't installed, IWLBeamformReader falls back to its NumPy implementation.
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+def _unpack_bfee(data: np.array, n_rx: int, n_tx: int, perm: np.array, csi: np.array):
+    """
+        Unpacks the IWL5300 CSI payload into a preallocated (30, n_rx, n_tx) complex64 matrix.
+
+        Parameters:
+            data {np.array} -- uint8 view of the CSI payload.
+            n_rx {int} -- Number of receiving antennas present.
+            n_tx {int} -- Number of transmitting antennas present.
+            perm {np.array} -- Antenna permutation, already clamped to range(n_rx).
+            csi {np.array} -- Zeroed output matrix. Entries beyond a truncated payload are left untouched.
+
+        Compiled without bounds checks, so n_rx/n_tx/perm must already have been checked by IWLBeamformReader.validate_antennas.
+    """
+
+    length = data.shape[0]
+
+    # remainder is only computed once per subcarrier.
+    # Each entry advances index by 16 bits, which leaves index & 7 unchanged.
+    index = 0
+    for i in range(30):
+        index += 3
+        remainder = index & 7
+        for j in range(n_rx):
+            for k in range(n_tx):
+                ind8 = index >> 3
+
+                if ind8 + 2 >= length:
+                    return
+
+                b0 = np.int64(data[ind8])
+                b1 = np.int64(data[ind8 + 1])
+                b2 = np.int64(data[ind8 + 2])
+
+                real = ((b0 >> remainder) | (b1 << (8 - remainder))) & 0xFF # 8-bit truncation
+                if real > 127: # convert from unsigned rep to signed
+                    real -= 256
+
+                imag = ((b1 >> remainder) | (b2 << (8 - remainder))) & 0xFF
+                if imag > 127:
+                    imag -= 256
+
+                csi[i, perm[j], k] = complex(real, imag)
+
+                index += 16
+
+def _unpack_bfee_i8(data: np.array, n_rx: int, n_tx: int, perm: np.array, raw: np.array):
+    """
+        Unpacks the IWL5300 CSI payload into preallocated (30, n_rx, n_tx, 2) int8 real/imag planes.
+
+        Parameters:
+            data {np.array} -- uint8 view of the CSI payload.
+            n_rx {int} -- Number of receiving antennas present.
+            n_tx {int} -- Number of transmitting antennas present.
+            perm {np.array} -- Antenna permutation, already clamped to range(n_rx).
+            raw {np.array} -- Zeroed output planes. Entries beyond a truncated payload are left untouched.
+
+        Compiled without bounds checks, so n_rx/n_tx/perm must already have been checked by IWLBeamformReader.validate_antennas.
+    """
+
+    length = data.shape[0]
+
+    index = 0
+    for i in range(30):
+        index += 3
+        remainder = index & 7
+        for j in range(n_rx):
+            for k in range(n_tx):
+                ind8 = index >> 3
+
+                if ind8 + 2 >= length:
+                    return
+
+                b0 = np.int64(data[ind8])
+                b1 = np.int64(data[ind8 + 1])
+                b2 = np.int64(data[ind8 + 2])
+
+                real = ((b0 >> remainder) | (b1 << (8 - remainder))) & 0xFF # 8-bit truncation
+                if real > 127: # convert from unsigned rep to signed
+                    real -= 256
+
+                imag = ((b1 >> remainder) | (b2 << (8 - remainder))) & 0xFF
+                if imag > 127:
+                    imag -= 256
+
+                raw[i, perm[j], k, 0] = real
+                raw[i, perm[j], k, 1] = imag
+
+                index += 16
+
+def _scan_frames(data: np.array) -> tuple:
+    """
+        Walks the size/code prefixed records of a Linux 802.11n CSI Tool log.
+
+        Parameters:
+            data {np.array} -- uint8 view of the whole file.
+
+        Returns:
+            offsets {np.array} -- Offset of each record's body (immediately after its 3 byte size/code prefix).
+            sizes {np.array} -- Size field of each record.
+            codes {np.array} -- Code field of each record.
+    """
+
+    length = data.shape[0]
+
+    # First pass counts records so the outputs can be allocated exactly.
+    count = 0
+    cursor = 0
+    while (length - cursor) > 100:
+        size = (np.int64(data[cursor]) << 8) | np.int64(data[cursor + 1])
+        cursor += size + 2
+        count += 1
+
+    offsets = np.empty(count, dtype=np.int64)
+    sizes = np.empty(count, dtype=np.int64)
+    codes = np.empty(count, dtype=np.int64)
+
+    cursor = 0
+    for n in range(count):
+        size = (np.int64(data[cursor]) << 8) | np.int64(data[cursor + 1])
+
+        offsets[n] = cursor + 3
+        sizes[n] = size
+        codes[n] = data[cursor + 2]
+
+        cursor += size + 2
+
+    return offsets, sizes, codes
+
+#Uncompiled scan, as run when Numba isn't installed. Kept so tests can exercise it either way.
+_scan_frames_py = _scan_frames
+
+if NUMBA_AVAILABLE:
+    _unpack_bfee = njit(cache=True, boundscheck=False)(_unpack_bfee)
+    _unpack_bfee_i8 = njit(cache=True, boundscheck=False)(_unpack_bfee_i8)
+    _scan_frames = njit(cache=True, boundscheck=False)(_scan_frames)
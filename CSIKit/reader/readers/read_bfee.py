@@ -1,25 +1,44 @@
+import functools
+import math
+import mmap
 import os
 import struct
 from time import time
 
 import numpy as np
 
-from math import floor
-
 from CSIKit.csi import CSIData
 from CSIKit.csi.frames import IWLCSIFrame
 from CSIKit.reader import Reader
+from CSIKit.reader.readers._bfee_numba import NUMBA_AVAILABLE, _scan_frames, _unpack_bfee, _unpack_bfee_i8
 from CSIKit.util import csitools
 
 from CSIKit.util.errors import print_length_error
-from CSIKit.util.matlab import db, dbinv
 
-SIZE_STRUCT = struct.Struct(">H").unpack
-CODE_STRUCT = struct.Struct("B").unpack
+# The Cython decoder is only present when built by setup.py.
+try:
+    from CSIKit.reader.readers._bfee_cython import read_bfee_c, read_bfee_i8_c
+    CYTHON_AVAILABLE = True
+except ImportError:
+    CYTHON_AVAILABLE = False
+
+CODE_STRUCT = struct.Struct("B")
 
-HEADER_STRUCT = struct.Struct("<LHHBBBBBbBBHH").unpack
+HEADER_STRUCT = struct.Struct("<LHHBBBBBbBBHH")
 VALID_BEAMFORMING_MEASUREMENT = 187
 
+#The IWL5300 supports at most 3 Rx/Tx chains. See validate_antennas.
+MAX_ANTENNAS = 3
+
+#Tx scaling factor for 3 transmit antennas, sqrt(dbinv(4.5)). See scale_csi_entry.
+SQRT_DBINV_4_5 = math.sqrt(math.pow(10.0, 0.45))
+
+#Additional CSI scaling by transmit antenna count. Any other count is left unscaled.
+#Note: the 3 antenna factor should be sqrt(3)~ 4.77dB. But 4.5dB is how
+#Intel and other makers approximate a factor of 3.
+#You may need to change this if your card does the right thing.
+TX_SCALE_FACTORS = {2: math.sqrt(2), 3: SQRT_DBINV_4_5}
+
 class IWLBeamformReader(Reader):
     """
         This class handles parsing for CSI data from both batched files and realtime CSI packets from IWL5300 hardware.
@@ -40,18 +59,20 @@ class IWLBeamformReader(Reader):
             # Quick heuristic for Linux 802.11n CSI Tool files
             # Check for the VALID_BEAMFORMING_MEASUREMENT code at 0x2.
             # Potentially may return a false negative for files which start with an invalid frame.
-            data = open(path, "rb").read()
+            # Only the first few bytes are needed, so don't read the whole capture.
+            with open(path, "rb") as file:
+                data = file.read(4)
             if len(data) < 4:
                 return False
 
-            code = CODE_STRUCT(data[2:3])[0]
+            code = CODE_STRUCT.unpack_from(data, 2)[0]
 
             return code == VALID_BEAMFORMING_MEASUREMENT
 
         return False
 
     @staticmethod
-    def read_bfee(data: bytes, n_rx: int, n_tx: int, expected_length: int, perm: list, i: int=0, filename: str="") -> np.array:
+    def read_bfee(data: bytes, n_rx: int, n_tx: int, expected_length: int, perm: list, i: int=0, filename: str="", out: np.array=None) -> np.array:
 
         #Flag invalid payloads so we don't error out trying to parse them into matrices.
         # actual_length = len(data)
@@ -59,78 +80,179 @@ class IWLBeamformReader(Reader):
         #     # return print_length_error(expected_length, actual_length, i, filename)
         #     return None
 
-        csi = np.zeros((30, n_rx, n_tx), dtype=np.complex64)
+        IWLBeamformReader.validate_antennas(n_rx, n_tx, perm)
 
-        index = 0
-        for i in range(30):
-            index += 3
-            remainder = index % 8
-            for j in range(n_rx):
-                for k in range(n_tx):
-                    ind8 = floor(index/8)
+        #If provided, out must be a zero-filled (30, n_rx, n_tx) complex64 array, which is decoded into and returned.
+        csi = out
+        if csi is None:
+            csi = np.zeros((30, n_rx, n_tx), dtype=np.complex64)
+        elif csi.shape != (30, n_rx, n_tx):
+            raise ValueError("Output shape {} does not match (30, {}, {}).".format(csi.shape, n_rx, n_tx))
 
-                    if ind8+2 >= len(data):
-                        break
+        buf = np.frombuffer(data, dtype=np.uint8)
+        if len(buf) < 3:
+            return csi
 
-                    real_left = data[ind8] >> remainder
-                    real_right = data[1 + ind8] << (8 - remainder)
+        #Clamp the permutation to the antennas actually present, rather than failing on invalid selections.
+        #Done once here so neither decode path needs to guard its stores.
+        perm = np.clip(np.asarray(perm[:n_rx], dtype=np.intp), 0, n_rx - 1)
 
-                    real = (real_left | real_right) & 0xFF # 8-bit truncation
-                    if real > 127: # convert from unsigned rep to signed
-                        real -= 256
+        if CYTHON_AVAILABLE:
+            read_bfee_c(buf, n_rx, n_tx, perm, csi)
+            return csi
 
-                    imag_left = data[1 + ind8] >> remainder
-                    imag_right = data[2 + ind8] << (8 - remainder)
+        if NUMBA_AVAILABLE:
+            _unpack_bfee(buf, n_rx, n_tx, perm, csi)
+            return csi
+
+        real, imag = IWLBeamformReader.unpack_bfee_i8(buf, n_rx, n_tx)
+
+        #Write both parts straight into the (possibly preallocated) output through its float32 real/imag views.
+        #This avoids building any complex temporaries, and works on padded views of a larger block.
+        csi.real[:, perm, :] = real
+        csi.imag[:, perm, :] = imag
+
+        return csi
 
-                    imag = (imag_left | imag_right) & 0xFF
-                    if imag > 127:
-                        imag -= 256
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def get_bfee_indices(n_rx: int, n_tx: int) -> tuple:
+        """
+            Returns the byte index and bit remainder of every (30, n_rx, n_tx) CSI entry, used by unpack_bfee_i8.
+            These only depend on the antenna configuration, so are computed once per configuration and cached (read-only).
 
-                    real = float(real)
-                    imag = float(imag)
+            Parameters:
+                n_rx {int} -- Number of receiving antennas present.
+                n_tx {int} -- Number of transmitting antennas present.
+        """
 
-                    complex_no = real + imag * 1j
+        #Each subcarrier begins with 3 unused bits, followed by n_rx*n_tx 16-bit entries (8-bit real, 8-bit imag).
+        #Compute the starting bit of every entry up front so they can all be unpacked at once.
+        stride = 3 + 16 * n_rx * n_tx
+        starts = (stride * np.arange(30))[:, None, None] + 3 + 16 * (n_tx * np.arange(n_rx)[:, None] + np.arange(n_tx)[None, :])
 
-                    csi[i][perm[j]][k] = complex_no
+        ind8 = starts >> 3
+        remainder = (starts & 7).astype(np.uint16)
 
-                    index += 16
+        ind8.flags.writeable = False
+        remainder.flags.writeable = False
 
-        return csi
+        return ind8, remainder
 
     @staticmethod
-    def read_bf_entry(data: bytes, scaled: bool=False) -> np.array:
+    def unpack_bfee_i8(buf: np.array, n_rx: int, n_tx: int) -> tuple:
+        """
+            Unpacks the IWL5300 CSI payload into (30, n_rx, n_tx) int8 real and imaginary planes, before antenna permutation.
 
-        csi_header = struct.unpack("<LHHBBBBBbBBHH", data[4:25])
-        all_data = [x[0] for x in struct.Struct(">B").iter_unpack(data[25:])]
+            Parameters:
+                buf {np.array} -- uint8 view of the CSI payload.
+                n_rx {int} -- Number of receiving antennas present.
+                n_tx {int} -- Number of transmitting antennas present.
+        """
 
-        n_rx = csi_header[3]
-        antenna_sel = csi_header[10]
+        ind8, remainder = IWLBeamformReader.get_bfee_indices(n_rx, n_tx)
+
+        #Entries running past the end of a truncated payload are left as zero.
+        valid = ind8 + 2 < len(buf)
+
+        b0 = np.take(buf, ind8, mode="clip").astype(np.uint16)
+        b1 = np.take(buf, ind8 + 1, mode="clip").astype(np.uint16)
+        b2 = np.take(buf, ind8 + 2, mode="clip").astype(np.uint16)
+
+        # 8-bit truncation, then reinterpret from unsigned to signed.
+        real = ((b0 >> remainder) | (b1 << (8 - remainder))).astype(np.uint8).view(np.int8)
+        imag = ((b1 >> remainder) | (b2 << (8 - remainder))).astype(np.uint8).view(np.int8)
+
+        real[~valid] = 0
+        imag[~valid] = 0
+
+        return real, imag
+
+    @staticmethod
+    def read_bfee_i8(data: bytes, n_rx: int, n_tx: int, perm: list, out: np.array=None) -> np.array:
+        """
+            Decodes the IWL5300 CSI payload into (30, n_rx, n_tx, 2) int8 real/imag planes, rather than complex64.
+
+            Parameters:
+                data {bytes} -- CSI payload.
+                n_rx {int} -- Number of receiving antennas present.
+                n_tx {int} -- Number of transmitting antennas present.
+                perm {list} -- Antenna permutation.
+                out {np.array} -- Optional zero-filled int8 array to decode into.
+        """
+
+        IWLBeamformReader.validate_antennas(n_rx, n_tx, perm)
+
+        raw = out
+        if raw is None:
+            raw = np.zeros((30, n_rx, n_tx, 2), dtype=np.int8)
+        elif raw.shape != (30, n_rx, n_tx, 2):
+            raise ValueError("Output shape {} does not match (30, {}, {}, 2).".format(raw.shape, n_rx, n_tx))
+
+        buf = np.frombuffer(data, dtype=np.uint8)
+        if len(buf) < 3:
+            return raw
+
+        perm = np.clip(np.asarray(perm[:n_rx], dtype=np.intp), 0, n_rx - 1)
+
+        if CYTHON_AVAILABLE:
+            read_bfee_i8_c(buf, n_rx, n_tx, perm, raw)
+            return raw
+
+        if NUMBA_AVAILABLE:
+            _unpack_bfee_i8(buf, n_rx, n_tx, perm, raw)
+            return raw
 
+        real, imag = IWLBeamformReader.unpack_bfee_i8(buf, n_rx, n_tx)
+        #Index through the plane views, as raw[:, perm, :, 0] would move the permuted axis to the front.
+        raw[..., 0][:, perm, :] = real
+        raw[..., 1][:, perm, :] = imag
+
+        return raw
+
+    @staticmethod
+    def validate_antennas(n_rx: int, n_tx: int, perm: list):
+        #The compiled decoders index perm and the output matrix without bounds checks,
+        #so antenna counts from corrupt headers must be rejected before they run.
+        if not (1 <= n_rx <= min(len(perm), MAX_ANTENNAS) and 1 <= n_tx <= MAX_ANTENNAS):
+            raise ValueError("Invalid antenna configuration: {} Rx, {} Tx.".format(n_rx, n_tx))
+
+    @staticmethod
+    def get_perm(n_rx: int, antenna_sel: int) -> tuple:
         #If less than 3 Rx antennas are detected, default permutation should be used.
         #Otherwise invalid indices will likely be raised.
-        perm = [0, 1, 2]
-        if sum(perm) == n_rx:
-            perm[0] = ((antenna_sel) & 0x3)
-            perm[1] = ((antenna_sel >> 2) & 0x3)
-            perm[2] = ((antenna_sel >> 4) & 0x3)
+        if n_rx == 3:
+            return (antenna_sel & 0x3, (antenna_sel >> 2) & 0x3, (antenna_sel >> 4) & 0x3)
+        return (0, 1, 2)
 
-        perm_typed = list()
-        [perm_typed.append(x) for x in perm]
+    @staticmethod
+    def read_bf_entry(data: bytes, scaled: bool=False, out: np.array=None) -> np.array:
+
+        #Netlink payloads (see legacy/netlink.py) hold 4 bytes of connector length/flags and the code byte before the header.
+        csi_header = HEADER_STRUCT.unpack_from(data, 5)
+        all_data = memoryview(data)[25:]
+
+        perm = IWLBeamformReader.get_perm(csi_header[3], csi_header[10])
 
         n_rx = csi_header[3]
         n_tx = csi_header[4]
         expected_length = csi_header[11]
 
-        csi_block = IWLBeamformReader.read_bfee(all_data, n_tx, n_rx, expected_length, perm_typed, scaled)
+        csi_block = IWLBeamformReader.read_bfee(all_data, n_rx, n_tx, expected_length, perm, out=out)
+        if scaled:
+            csi_block = IWLBeamformReader.scale_csi_entry(csi_block, csi_header)
 
         return csi_block
 
-    def read_file(self, path: str, scaled: bool=False, filter_mac: str=None) -> CSIData:
+    def read_file(self, path: str, scaled: bool=False, filter_mac: str=None, raw_i8: bool=False) -> CSIData:
         """
             This function parses .dat files generated by log_to_file.
 
             Parameters:
                 file (filereader): File reader object returned from open().
+                raw_i8 (bool): Keep CSI as int8 real/imag planes (IWLCSIFrame.raw_i8), with scaling applied lazily.
+                    Uses a quarter of the memory of complex64. csi_matrix is built on each access rather than stored,
+                    so tools reading every frame's csi_matrix (e.g. csitools.get_CSI) trade that memory for repeated conversion.
 
             Returns:
                 total_csi (list): All valid CSI blocks contained within the given file.
@@ -143,84 +265,142 @@ class IWLBeamformReader(Reader):
         if not os.path.exists(path):
             raise Exception("File not found: {}".format(path))
 
-        data = open(path, "rb").read()
-
-        length = len(data)
+        with open(path, "rb") as file:
+            try:
+                #Map the file rather than reading it, so pages are only loaded as the parser touches them.
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                #Empty files can't be mapped, and mmap may be unavailable for some files/platforms.
+                #Fall back to reading into a preallocated buffer, which avoids the extra copy made by read().
+                data = bytearray(os.path.getsize(path))
+                file.readinto(data)
 
-        cursor = 0
+        self.read_frames(data, ret_data, scaled, raw_i8)
 
-        initial_timestamp = 0
+        #All views into the mapping are released once read_frames returns, so it can be closed here.
+        #If parsing raises, the traceback's frames still hold views (and close() would raise BufferError),
+        #so the mapping is instead closed when it's garbage collected.
+        if isinstance(data, mmap.mmap):
+            data.close()
 
-        while (length - cursor) > 100:
-            size = SIZE_STRUCT(data[cursor:cursor+2])[0]
-            code = CODE_STRUCT(data[cursor+2:cursor+3])[0]
-            
-            cursor += 3
+        return ret_data
 
-            if code == VALID_BEAMFORMING_MEASUREMENT:
-                all_block = data[cursor:cursor+size-1]
+    def read_frames(self, data: bytes, ret_data: CSIData, scaled: bool=False, raw_i8: bool=False):
+        """
+            This function parses every frame within a buffer containing a log_to_file capture.
 
-                header_block = HEADER_STRUCT(all_block[:20])
-                data_block = all_block[20:]
+            Parameters:
+                data (bytes): Buffer (bytes, bytearray or mmap) containing the capture.
+                ret_data (CSIData): CSIData object to which parsed frames are pushed.
+                scaled (bool): Whether CSI should be scaled via scale_csi_entry.
+                raw_i8 (bool): Whether CSI should be kept as int8 planes. See read_file.
+        """
+        mv = memoryview(data)
+
+        buf = np.frombuffer(data, dtype=np.uint8)
+
+        #Locate every record up front, leaving only the per-frame decode to the loop below.
+        offsets, sizes, codes = _scan_frames(buf)
+
+        #Records whose headers claim an unsupported antenna count (e.g. from corruption) are skipped,
+        #so they can neither reach the decoders nor inflate the size of the shared CSI block below.
+        n_rx_all = buf[offsets + 8]
+        n_tx_all = buf[offsets + 9]
+        valid_antennas = (n_rx_all >= 1) & (n_rx_all <= MAX_ANTENNAS) & (n_tx_all >= 1) & (n_tx_all <= MAX_ANTENNAS)
+
+        #Every valid record yields a frame, so the frame list can be sized once up front.
+        decodable = (codes == VALID_BEAMFORMING_MEASUREMENT) & valid_antennas
+        header_offsets = offsets[decodable]
+        frames = [None] * len(header_offsets)
+        frame_count = 0
+
+        #Decode every frame into one preallocated (frames, 30, n_rx, n_tx) block, rather than allocating per frame.
+        #Captures with mixed antenna configurations are padded to the largest seen, and each frame gets a view of its own shape.
+        max_rx = buf[header_offsets + 8].max(initial=0)
+        max_tx = buf[header_offsets + 9].max(initial=0)
+        if raw_i8:
+            raw_all = np.zeros((len(header_offsets), 30, max_rx, max_tx, 2), dtype=np.int8)
+        else:
+            csi_all = np.zeros((len(header_offsets), 30, max_rx, max_tx), dtype=np.complex64)
+
+        #timestamp_low is the first (little-endian uint32) field of each header, counting microseconds.
+        #Gather all of them at once rather than converting per frame.
+        timestamp_bytes = buf[header_offsets[:, None] + np.arange(4)]
+        timestamps = timestamp_bytes.view("<u4")[:, 0].astype(np.float64) * 1e-6
+
+        #Timestamps are made relative to the first non-zero timestamp_low.
+        nonzero = np.flatnonzero(timestamps)
+        if len(nonzero) > 0:
+            timestamps[nonzero[0]:] -= timestamps[nonzero[0]]
+
+        for cursor, size, code, antennas_ok in zip(offsets.tolist(), sizes.tolist(), codes.tolist(), valid_antennas.tolist()):
+            if code == VALID_BEAMFORMING_MEASUREMENT and not antennas_ok:
+                print("Invalid antenna configuration for beamforming measurement at {}.".format(hex(cursor)))
+                ret_data.skipped_frames += 1
+            elif code == VALID_BEAMFORMING_MEASUREMENT:
+                #Unpack straight from the memoryview to avoid copying each frame.
+                header_block = HEADER_STRUCT.unpack_from(mv, cursor)
+                data_block = mv[cursor+20:cursor+size-1]
 
                 #Going to leave permutation params out of the data for now.
                 #At some point, this needs to end up in the header_block.
                 #I'd prefer that to passing it as a parameter in the constructor.
                 #But since it's derived, it can't be in the HEADER_STRUCT. Lame.
 
-                n_rx = header_block[3]
-                antenna_sel = header_block[10]
-
-                #If less than 3 Rx antennas are detected, default permutation should be used.
-                #Otherwise invalid indices will likely be raised.
-                perm = [0, 1, 2]
-                if n_rx == 3:
-                    perm[0] = ((antenna_sel) & 0x3)
-                    perm[1] = ((antenna_sel >> 2) & 0x3)
-                    perm[2] = ((antenna_sel >> 4) & 0x3)
+                perm = IWLBeamformReader.get_perm(header_block[3], header_block[10])
 
                 n_tx = header_block[3]
                 n_rx = header_block[4]
                 expected_length = header_block[11]
 
-                csi_matrix = IWLBeamformReader.read_bfee(data_block, n_tx, n_rx, expected_length, perm, ret_data.expected_frames)
-                if csi_matrix is not None:
-                    if scaled:
-                        csi_matrix = IWLBeamformReader.scale_csi_entry(csi_matrix, header_block)
+                #n_tx/n_rx are swapped above, so views are (30, header n_rx, header n_tx).
+                if raw_i8:
+                    raw = IWLBeamformReader.read_bfee_i8(data_block, n_tx, n_rx, perm, out=raw_all[frame_count, :, :n_tx, :n_rx])
 
-                    frame = IWLCSIFrame(header_block, csi_matrix)
+                    scale_factor = 1.0
+                    if scaled:
+                        #Integer power is exact, and matches the complex64 path.
+                        raw_flat = raw.ravel().astype(np.int32)
+                        scale_factor = IWLBeamformReader.get_scale_factor(float(np.dot(raw_flat, raw_flat)), header_block)
 
-                    timestamp_low = header_block[0] * 10e-7
+                    frames[frame_count] = IWLCSIFrame(header_block, None, raw_i8=raw, scale_factor=scale_factor)
+                else:
+                    out = csi_all[frame_count, :, :n_tx, :n_rx]
 
-                    if initial_timestamp == 0:
-                        initial_timestamp = timestamp_low
+                    csi_matrix = IWLBeamformReader.read_bfee(data_block, n_tx, n_rx, expected_length, perm, ret_data.expected_frames, out=out)
+                    if scaled:
+                        csi_matrix = IWLBeamformReader.scale_csi_entry(csi_matrix, header_block)
 
-                    ret_data.push_frame(frame, timestamp_low - initial_timestamp)
+                    frames[frame_count] = IWLCSIFrame(header_block, csi_matrix)
+                frame_count += 1
             else:
                 print("Invalid code for beamforming measurement at {}.".format(hex(cursor)))
 
             ret_data.expected_frames += 1
-            cursor += size-1
 
-        return ret_data
+        ret_data.push_frames(frames, timestamps.tolist())
 
     @staticmethod
     def get_total_rss(rssi_a: int, rssi_b: int, rssi_c: int, agc: int) -> float:
         # Calculates the Received Signal Strength (RSS) in dBm
         # Careful here: rssis could be zero
+        # dbinv/db are inlined with scalar math, as this runs for every scaled frame.
 
         rssi_mag = 0
         if rssi_a != 0:
-            rssi_mag = rssi_mag + dbinv(rssi_a)
+            rssi_mag = rssi_mag + math.pow(10.0, rssi_a * 0.1)
         if rssi_b != 0:
-            rssi_mag = rssi_mag + dbinv(rssi_b)
+            rssi_mag = rssi_mag + math.pow(10.0, rssi_b * 0.1)
         if rssi_c != 0:
-            rssi_mag = rssi_mag + dbinv(rssi_c)
+            rssi_mag = rssi_mag + math.pow(10.0, rssi_c * 0.1)
+
+        if rssi_mag == 0:
+            return -math.inf
 
         #Interpreting RSS magnitude as power for RSS/dBm conversion.
         #This is consistent with Linux 802.11n CSI Tool's MATLAB implementation.
         #As seen in get_total_rss.m.
-        return db(rssi_mag, "pow") - 44 - agc
+        return 10.0 * math.log10(rssi_mag) - 44 - agc
 
     @staticmethod
     def scale_csi_entry(csi: np.array, header: list) -> np.array:
@@ -228,8 +408,31 @@ class IWLBeamformReader(Reader):
             This function performs scaling on the retrieved CSI data to account for automatic gain control and other factors.
             Code within this section is largely based on the Linux 802.11n CSI Tool's MATLAB implementation (get_scaled_csi.m).
 
+            The CSI matrix is scaled in place, and returned.
+
             Parameters:
-                frame {dict} -- CSI frame object for which CSI is to be scaled.
+                csi {np.array} -- CSI matrix to be scaled.
+                header {list} -- Header block for the frame the CSI belongs to.
+        """
+
+        #vdot conjugates its first argument, giving sum(|csi|^2) in one BLAS call without an intermediate array.
+        #csi may be a padded view, so it's only flattened once.
+        csi_flat = csi.ravel()
+        csi_pwr = float(np.vdot(csi_flat, csi_flat).real)
+
+        # csi now has units of sqrt(SNR) just like H in textbooks.
+        np.multiply(csi, np.float32(IWLBeamformReader.get_scale_factor(csi_pwr, header)), out=csi)
+
+        return csi
+
+    @staticmethod
+    def get_scale_factor(csi_pwr: float, header: list) -> float:
+        """
+            This function calculates the scalar applied to CSI by scale_csi_entry.
+
+            Parameters:
+                csi_pwr {float} -- Total power of the unscaled CSI matrix, sum(|csi|^2).
+                header {list} -- Header block for the frame the CSI belongs to.
         """
 
         n_rx = header[3]
@@ -241,16 +444,13 @@ class IWLBeamformReader(Reader):
 
         noise = header[8]
         agc = header[9]
-        
-        #Calculate the scale factor between normalized CSI and RSSI (mW).
-        csi_sq = np.multiply(csi, np.conj(csi))
-        csi_pwr = np.sum(csi_sq)
-        csi_pwr = np.real(csi_pwr)
 
+        #Calculate the scale factor between normalized CSI and RSSI (mW).
         rssi_pwr_db = IWLBeamformReader.get_total_rss(rssi_a, rssi_b, rssi_c, agc)
-        rssi_pwr = dbinv(rssi_pwr_db)
+        rssi_pwr = math.pow(10.0, rssi_pwr_db * 0.1)
         #Scale CSI -> Signal power : rssi_pwr / (mean of csi_pwr)
-        scale = rssi_pwr / (csi_pwr / 30)
+        #All-zero CSI gives an infinite scale (and so NaN CSI), as NumPy division would.
+        scale = rssi_pwr / (csi_pwr / 30) if csi_pwr != 0 else math.inf
 
         #Thermal noise may be undefined if the trace was captured in monitor mode.
         #If so, set it to 92.
@@ -258,8 +458,7 @@ class IWLBeamformReader(Reader):
         if (noise == -127):
             noise_db = -92
 
-        noise_db = float(noise_db)
-        thermal_noise_pwr = dbinv(noise_db)
+        thermal_noise_pwr = math.pow(10.0, noise_db * 0.1)
 
         #Quantization error: the coefficients in the matrices are 8-bit signed numbers,
         #max 127/-128 to min 0/1. Given that Intel only uses a 6-bit ADC, I expect every
@@ -273,14 +472,6 @@ class IWLBeamformReader(Reader):
         #Noise and error power.
         total_noise_pwr = thermal_noise_pwr + quant_error_pwr
 
-        # ret now has units of sqrt(SNR) just like H in textbooks.
-        ret = csi * np.sqrt(scale / total_noise_pwr)
-        if n_tx == 2:
-            ret = ret * np.sqrt(2)
-        elif n_tx == 3:
-            #Note: this should be sqrt(3)~ 4.77dB. But 4.5dB is how
-            #Intel and other makers approximate a factor of 3.
-            #You may need to change this if your card does the right thing.
-            ret = ret * np.sqrt(dbinv(4.5))
-
-        return ret
\ No newline at end of file
+        #The scalar chain above stays in Python floats, and is folded with the tx factor into one scalar.
+        #Callers apply it as float32, so complex64 matrices aren't upcast to complex128.
+        return math.sqrt(scale / total_noise_pwr) * TX_SCALE_FACTORS.get(n_tx, 1.0)
\ No newline at end of file
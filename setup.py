@@ -1,2 +1,13 @@
-from setuptools import setup
-setup()
\ No newline at end of file
+from setuptools import Extension, setup
+
+# The compiled IWL5300 decoder is optional.
+# Without Cython (or a working compiler) the reader uses its Numba/NumPy implementation instead.
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize([
+        Extension("CSIKit.reader.readers._bfee_cython", ["CSIKit/reader/readers/_bfee_cython.pyx"], optional=True)
+    ])
+except ImportError:
+    ext_modules = []
+
+setup(ext_modules=ext_modules)
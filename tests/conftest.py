@@ -0,0 +1,25 @@
+from CSIKit.reader.readers import _bfee_numba
+from CSIKit.reader.readers import read_bfee
+
+import pytest
+
+
+# IWLBeamformReader prefers Cython, then Numba, then NumPy.
+# Force each decoder in turn, skipping those which aren't installed/built here.
+@pytest.fixture(params=["numpy", "numba", "cython"])
+def iwl_backend(request, monkeypatch):
+    backend = request.param
+
+    if backend == "numba" and not _bfee_numba.NUMBA_AVAILABLE:
+        pytest.skip("numba is not installed.")
+    if backend == "cython" and not read_bfee.CYTHON_AVAILABLE:
+        pytest.skip("The Cython IWL5300 decoder has not been built.")
+
+    monkeypatch.setattr(read_bfee, "NUMBA_AVAILABLE", backend == "numba")
+    monkeypatch.setattr(read_bfee, "CYTHON_AVAILABLE", backend == "cython")
+
+    # Without Numba, the record scan is also left uncompiled.
+    if backend == "numpy":
+        monkeypatch.setattr(read_bfee, "_scan_frames", _bfee_numba._scan_frames_py)
+
+    return backend
@@ -13,7 +13,33 @@ class InconsistentOutputError(RuntimeError):
     def __init__(self, arg):
         self.args = arg
 
-def test_intel_matlab_consistency():
+def load_mat_matrices(mat_path: str) -> tuple:
+    mat_dict = scipy.io.loadmat(mat_path)
+    mat_csibuff_data = mat_dict["csi"]
+    mat_csibuff_scaled_data = mat_dict["csi_scaled"]
+
+    # The "csi" cells returned by read_bf_file are not raw CSI matrices, but the parsed frames.
+    # We need to manually extract the complex matrix ourselves.
+    # For this, we'll be assuming consistent antenna configuration across the packet trace.
+    # (Time will tell if that actually causes any problems.)
+    # mat_csibuff_data is a dense set of labelled tuples.
+    # We just need the csi matrix inside.
+    no_frames = mat_csibuff_data.shape[0]
+    mat_csibuff_matrices = []
+    for i in range(no_frames):
+        frame = mat_csibuff_data[i]
+        matrix = frame[0][0][0][-1] # Who decided load_mat would use nested tuples?!!? I JUST WANNA TALK
+        mat_csibuff_matrices.append(np.transpose(matrix))
+
+    mat_csibuff_scaled_matrices = []
+    for i in range(no_frames):
+        frame = mat_csibuff_scaled_data[i]
+        matrix = frame[0]
+        mat_csibuff_scaled_matrices.append(np.transpose(matrix))
+
+    return mat_csibuff_matrices, mat_csibuff_scaled_matrices
+
+def test_intel_matlab_consistency(iwl_backend):
 
     example_dir = os.environ["INTEL_TEST_EXAMPLE_DIR"]
     mat_dir = os.environ["INTEL_TEST_MAT_DIR"]
@@ -51,28 +77,8 @@ def test_intel_matlab_consistency():
             print("Exiting.")
             exit(1)
 
-        mat_dict = scipy.io.loadmat(mat_path)
-        mat_csibuff_data = mat_dict["csi"]
-        mat_csibuff_scaled_data = mat_dict["csi_scaled"]
-
-        # The "csi" cells returned by read_bf_file are not raw CSI matrices, but the parsed frames.
-        # We need to manually extract the complex matrix ourselves.
-        # For this, we'll be assuming consistent antenna configuration across the packet trace.
-        # (Time will tell if that actually causes any problems.)
-        # mat_csibuff_data is a dense set of labelled tuples.
-        # We just need the csi matrix inside.
-        no_frames = mat_csibuff_data.shape[0]
-        mat_csibuff_matrices = []
-        for i in range(no_frames):
-            frame = mat_csibuff_data[i]
-            matrix = frame[0][0][0][-1] # Who decided load_mat would use nested tuples?!!? I JUST WANNA TALK
-            mat_csibuff_matrices.append(np.transpose(matrix))
-
-        mat_csibuff_scaled_matrices = []
-        for i in range(no_frames):
-            frame = mat_csibuff_scaled_data[i]
-            matrix = frame[0]
-            mat_csibuff_scaled_matrices.append(np.transpose(matrix))
+        mat_csibuff_matrices, mat_csibuff_scaled_matrices = load_mat_matrices(mat_path)
+        no_frames = len(mat_csibuff_matrices)
 
         dat_csidata = reader.read_file(dat_path)
         dat_csiframe_matrices = [x.csi_matrix for x in dat_csidata.frames]
@@ -114,3 +120,36 @@ def test_intel_matlab_consistency():
         raise InconsistentOutputError("No tests performed. Ensure .dat and .mat files are present in their respective directories.")
 
     # print("Intel Tests complete: {}/{} successful.".format(success_count, test_count))
+
+def test_intel_raw_i8_matlab_consistency(iwl_backend):
+
+    example_dir = os.environ["INTEL_TEST_EXAMPLE_DIR"]
+    mat_dir = os.environ["INTEL_TEST_MAT_DIR"]
+
+    reader = IWLBeamformReader()
+
+    example_files = sorted(glob.glob(os.path.join(example_dir, "*.dat")))
+    matlab_files = sorted(glob.glob(os.path.join(mat_dir, "*.mat")))
+
+    assert len(example_files) > 0
+
+    for dat_path, mat_path in zip(example_files, matlab_files):
+        dat_filename = os.path.splitext(os.path.basename(dat_path))[0]
+        mat_filename = os.path.splitext(os.path.basename(mat_path))[0]
+        assert dat_filename == mat_filename
+
+        mat_csibuff_matrices, mat_csibuff_scaled_matrices = load_mat_matrices(mat_path)
+
+        # int8 planes should give the same CSI as the complex64 path, both via csi_matrix and amplitude().
+        for scaled, mat_matrices in [(False, mat_csibuff_matrices), (True, mat_csibuff_scaled_matrices)]:
+            dat_csidata = reader.read_file(dat_path, scaled=scaled, raw_i8=True)
+            assert len(dat_csidata.frames) == len(mat_matrices)
+
+            for frame, mat_frame_matrix in zip(dat_csidata.frames, mat_matrices):
+                assert frame.raw_i8.dtype == np.int8
+
+                if not np.allclose(np.abs(mat_frame_matrix), frame.amplitude(), atol=1e-8):
+                    raise InconsistentOutputError("Stored MATLAB output does not match CSIKit's int8 amplitudes.")
+
+                if not np.allclose(mat_frame_matrix, frame.csi_matrix, atol=1e-8):
+                    raise InconsistentOutputError("Stored MATLAB output does not match CSIKit's int8 matrices.")
@@ -0,0 +1,132 @@
+from CSIKit.reader import IWLBeamformReader
+
+import numpy as np
+import os
+import pytest
+
+
+def read_example() -> bytes:
+    example_dir = os.environ["INTEL_TEST_EXAMPLE_DIR"]
+    with open(os.path.join(example_dir, "example.dat"), "rb") as file:
+        return file.read()
+
+def test_bfee_corrupt_antenna_count(iwl_backend, tmp_path):
+    data = bytearray(read_example())
+
+    # The first record's header starts after its 3 byte size/code prefix, with n_rx at 0x8.
+    # Claim 40 Rx antennas, which must be rejected rather than reaching the decoders.
+    data[3 + 8] = 40
+
+    path = tmp_path / "corrupt.dat"
+    path.write_bytes(bytes(data))
+
+    reader = IWLBeamformReader()
+    expected_frames = len(reader.read_file(os.path.join(os.environ["INTEL_TEST_EXAMPLE_DIR"], "example.dat")).frames)
+
+    csi_data = reader.read_file(str(path))
+    assert len(csi_data.frames) == expected_frames - 1
+    assert len(csi_data.timestamps) == expected_frames - 1
+    assert csi_data.skipped_frames == 1
+
+    with pytest.raises(ValueError):
+        IWLBeamformReader.read_bfee(bytes(data[23:]), 4, 1, 0, [0, 1, 2])
+
+    with pytest.raises(ValueError):
+        IWLBeamformReader.read_bfee(bytes(data[23:]), 3, 4, 0, [0, 1, 2])
+
+    with pytest.raises(ValueError):
+        IWLBeamformReader.read_bfee(bytes(data[23:]), 3, 2, 0, [0, 1, 2], out=np.zeros((30, 1, 1), dtype=np.complex64))
+
+@pytest.mark.parametrize("scaled", [False, True])
+def test_bfee_read_bf_entry(iwl_backend, scaled):
+    data = read_example()
+
+    # Each record is a 2 byte size, followed by that many bytes of code, header and CSI.
+    # Netlink payloads (see legacy/netlink.py) carry 4 bytes of connector length/flags before the code byte.
+    size = int.from_bytes(data[:2], "big")
+    payload = bytes(4) + data[2:2 + size]
+
+    entry_matrix = IWLBeamformReader.read_bf_entry(payload, scaled=scaled)
+
+    path = os.path.join(os.environ["INTEL_TEST_EXAMPLE_DIR"], "example.dat")
+    file_matrix = IWLBeamformReader().read_file(path, scaled=scaled).frames[0].csi_matrix
+
+    assert entry_matrix.shape == file_matrix.shape
+    assert np.array_equal(entry_matrix, file_matrix)
+
+def test_bfee_raw_i8_csi_matrix_setter():
+    path = os.path.join(os.environ["INTEL_TEST_EXAMPLE_DIR"], "example.dat")
+    frame = IWLBeamformReader().read_file(path, scaled=True, raw_i8=True).frames[0]
+
+    # Assigning a matrix must replace the int8 planes, rather than being shadowed by them.
+    csi_matrix = np.ones((30, frame.n_rx, frame.n_tx), dtype=np.complex64) * (3 + 4j)
+    frame.csi_matrix = csi_matrix
+
+    assert frame.raw_i8 is None
+    assert frame.csi_matrix is csi_matrix
+    assert frame.complex() is csi_matrix
+    assert np.array_equal(frame.amplitude(), np.abs(csi_matrix))
+
+def test_bfee_decode_failure_propagates(monkeypatch):
+    path = os.path.join(os.environ["INTEL_TEST_EXAMPLE_DIR"], "example.dat")
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("Injected decode failure.")
+
+    # Views into the capture mapping are still alive while the error propagates.
+    # The original error must reach the caller, rather than one from closing the mapping.
+    monkeypatch.setattr(IWLBeamformReader, "read_bfee", staticmethod(fail))
+
+    with pytest.raises(RuntimeError):
+        IWLBeamformReader().read_file(path)
+
+def test_bfee_raw_i8_csi_matrix_not_cached():
+    path = os.path.join(os.environ["INTEL_TEST_EXAMPLE_DIR"], "example.dat")
+    frame = IWLBeamformReader().read_file(path, raw_i8=True).frames[0]
+
+    # Caching the complex64 matrix alongside raw_i8 would use more memory than not using raw_i8 at all.
+    csi_matrix = frame.csi_matrix
+    assert frame.raw_i8 is not None
+    assert frame.csi_matrix is not csi_matrix
+    assert np.array_equal(frame.csi_matrix, csi_matrix)
+
+def test_bfee_scale_zero_power():
+    # timestamp_low, bfee_count, reserved, n_rx, n_tx, rssi_a, rssi_b, rssi_c, noise, agc, antenna_sel, length, rate
+    header = (0, 0, 0, 3, 2, 30, 31, 32, -92, 40, 0, 0, 0)
+
+    # All-zero CSI has no power to normalise against. Like the original NumPy division, this gives NaN rather than raising.
+    assert np.isnan(IWLBeamformReader.get_scale_factor(0.0, header))
+    csi = IWLBeamformReader.scale_csi_entry(np.zeros((30, 3, 2), dtype=np.complex64), header)
+    assert csi.dtype == np.complex64
+    assert np.isnan(csi).all()
+
+    # All-zero RSSI gives -inf dBm, so the CSI is scaled to zero.
+    zero_rssi_header = (0, 0, 0, 3, 2, 0, 0, 0, -92, 40, 0, 0, 0)
+    assert IWLBeamformReader.get_total_rss(0, 0, 0, 40) == -np.inf
+    csi = IWLBeamformReader.scale_csi_entry(np.ones((30, 3, 2), dtype=np.complex64), zero_rssi_header)
+    assert np.array_equal(csi, np.zeros((30, 3, 2), dtype=np.complex64))
+
+def test_bfee_timestamps(tmp_path):
+    path = os.path.join(os.environ["INTEL_TEST_EXAMPLE_DIR"], "example.dat")
+    reader = IWLBeamformReader()
+
+    # timestamp_low counts microseconds, relative to the first frame.
+    timestamps = reader.read_file(path).timestamps
+    assert len(timestamps) == 26
+    assert np.allclose(timestamps[:5], [0.0, 0.000447, 0.099647, 0.100017, 0.100415])
+    assert np.isclose(timestamps[-1], 2.014226)
+
+    # Leading zero timestamp_low values stay at zero, and later frames are relative to the first non-zero one.
+    data = bytearray(read_example())
+    cursor = 0
+    for _ in range(2):
+        size = int.from_bytes(data[cursor:cursor + 2], "big")
+        data[cursor + 3:cursor + 7] = bytes(4)
+        cursor += size + 2
+
+    path = tmp_path / "zero_timestamps.dat"
+    path.write_bytes(bytes(data))
+
+    timestamps = reader.read_file(str(path)).timestamps
+    assert len(timestamps) == 26
+    assert np.allclose(timestamps[:6], [0.0, 0.0, 0.0, 0.00037, 0.000768, 0.100977])